@@ -4,7 +4,7 @@ TCP Chat Server
 A simple multi-client chat server using only Python standard library.
 
 Features:
-- Multi-client support (thread-per-client)
+- Multi-client support (single-threaded selectors event loop)
 - Login with unique username
 - Message broadcasting
 - Private messages (DM)
@@ -14,326 +14,597 @@ Features:
 
 Usage:
     python server.py [--port PORT]
-    
+
 Environment Variables:
     PORT - Server port (default: 4000)
 """
 
 import socket
-import threading
+import selectors
 import argparse
 import os
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# sendmsg (scatter-gather writev) is POSIX-only
+_HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+
+
+def _drain_lines(buf: bytearray) -> List[bytes]:
+    """Split all complete lines out of *buf*, leaving any partial tail.
+
+    This is the per-message inner loop; it is kept as a standalone
+    function so a compiled implementation (Cython/mypyc) could be
+    dropped in without touching the server. The per-iteration work
+    (bytes.find, bytearray slicing) already runs in C.
+    """
+    lines = []
+    while True:
+        i = buf.find(b'\n')
+        if i < 0:
+            return lines
+        lines.append(bytes(buf[:i]))
+        del buf[:i + 1]
+
+
+class Client:
+    """Per-connection state for one client socket."""
+
+    __slots__ = ('sock', 'name', 'buffer', 'out', 'bucket', 'deadline')
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        # Username, set on successful LOGIN
+        self.name: Optional[str] = None
+        # Receive buffer for partial lines
+        self.buffer = bytearray()
+        # Outgoing bytes the kernel couldn't take yet; flushed (and
+        # coalesced into single sends) when the socket drains
+        self.out = bytearray()
+        # Timer-wheel bucket index (-1 = not scheduled) and deadline
+        self.bucket = -1
+        self.deadline = 0.0
 
 
 class ChatServer:
-    """Multi-client TCP chat server."""
-    
-    def __init__(self, host: str = '0.0.0.0', port: int = 4000, idle_timeout: int = 60):
+    """Multi-client TCP chat server driven by a selectors event loop."""
+
+    __slots__ = ('host', 'port', 'idle_timeout', 'reuse_port',
+                 'server_socket', 'selector', 'clients', 'by_name',
+                 '_recipients', 'wheel', '_wheel_pos', '_dispatch',
+                 'running')
+
+    # Number of 1-second buckets in the idle-timeout timer wheel
+    WHEEL_SIZE = 64
+
+    # Maximum length of a single protocol line; a client that buffers
+    # more than this without a newline is disconnected
+    MAX_LINE = 64 * 1024
+
+    # Maximum pending output per client; a peer too slow to drain this
+    # much is disconnected rather than held in memory indefinitely
+    MAX_OUTBUF = 1024 * 1024
+
+    # Pre-encoded constant replies: the hot PING/PONG and login paths
+    # send these without any per-call str building or encoding
+    _OK = b"OK\n"
+    _PONG = b"PONG\n"
+    _ERR_INVALID_USERNAME = b"ERR invalid-username\n"
+    _ERR_USERNAME_TAKEN = b"ERR username-taken\n"
+    _ERR_MUST_LOGIN = b"ERR must-login-first\n"
+    _ERR_INVALID_DM = b"ERR invalid-dm-format\n"
+    _ERR_IDLE_TIMEOUT = b"ERR idle-timeout\n"
+    _ERR_LINE_TOO_LONG = b"ERR line-too-long\n"
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 4000, idle_timeout: int = 60,
+                 reuse_port: bool = False):
         self.host = host
         self.port = port
         self.idle_timeout = idle_timeout
+        self.reuse_port = reuse_port
         self.server_socket: Optional[socket.socket] = None
-        
-        # Thread-safe client management
-        # Maps socket -> username
-        self.clients: Dict[socket.socket, str] = {}
-        # Maps username -> socket (for DM lookup)
-        self.usernames: Dict[str, socket.socket] = {}
-        # Lock for thread-safe access to client dictionaries
-        self.lock = threading.Lock()
-        
-        # Track last activity time for idle timeout
-        self.last_activity: Dict[socket.socket, float] = {}
-        
+        # Event loop: epoll on Linux, kqueue on BSD/macOS
+        self.selector: Optional[selectors.BaseSelector] = None
+
+        # All state below is owned by the single event-loop thread,
+        # so no locking is needed.
+        # Maps socket -> Client (every connection, logged in or not)
+        self.clients: Dict[socket.socket, Client] = {}
+        # Maps username -> Client (for DM lookup, logged-in only)
+        self.by_name: Dict[str, Client] = {}
+        # Cached broadcast fan-out: rebuilt only on login/disconnect,
+        # so steady-state broadcasts allocate no per-message snapshot
+        self._recipients: Tuple[Client, ...] = ()
+
+        # Idle-timeout timer wheel: each client lives in the bucket of
+        # its expiry second (mod WHEEL_SIZE), so expiring is O(1) per
+        # drained bucket instead of a scan over every client.
+        self.wheel: List[Set[Client]] = [set() for _ in range(self.WHEEL_SIZE)]
+        # Last wall-clock second whose bucket has been drained
+        self._wheel_pos = 0
+
+        # O(1) command dispatch instead of chained startswith scans
+        self._dispatch = {
+            'MSG': self._cmd_msg,
+            'WHO': self._cmd_who,
+            'DM': self._cmd_dm,
+            'PING': self._cmd_ping,
+        }
+
         self.running = False
-    
+
     def start(self):
         """Start the chat server."""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
+        if self.reuse_port and hasattr(socket, 'SO_REUSEPORT'):
+            # Let several server processes share the port; the kernel
+            # hash-distributes incoming connections across them. Note
+            # that each process keeps its own user registry, so rooms
+            # do not span processes.
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
         try:
             self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(10)
+            # Full kernel accept queue so connect bursts aren't dropped
+            self.server_socket.listen(socket.SOMAXCONN)
+            self.server_socket.setblocking(False)
+
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.server_socket, selectors.EVENT_READ)
             self.running = True
-            
+
             print(f"[SERVER] Chat server started on {self.host}:{self.port}")
             print(f"[SERVER] Idle timeout: {self.idle_timeout} seconds")
             print("[SERVER] Waiting for connections...")
-            
-            # Start idle checker thread
-            idle_thread = threading.Thread(target=self._check_idle_clients, daemon=True)
-            idle_thread.start()
-            
+
+            self._wheel_pos = int(time.time())
+
             while self.running:
-                try:
-                    conn, addr = self.server_socket.accept()
-                    print(f"[SERVER] New connection from {addr}")
-                    
-                    # Start a new thread to handle this client
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(conn, addr),
-                        daemon=True
-                    )
-                    client_thread.start()
-                    
-                except socket.error as e:
-                    if self.running:
-                        print(f"[SERVER] Socket error: {e}")
-                        
+                # Sleep until the next socket event or the next timer
+                # bucket that could expire (None = no timers pending)
+                events = self.selector.select(self._next_timer_delay())
+
+                for key, mask in events:
+                    if key.fileobj is self.server_socket:
+                        self._accept()
+                        continue
+                    if mask & selectors.EVENT_WRITE:
+                        self._handle_writable(key.fileobj)
+                    if mask & selectors.EVENT_READ and key.fileobj in self.clients:
+                        self._handle_readable(key.fileobj)
+
+                self._expire_timers()
+
         except KeyboardInterrupt:
             print("\n[SERVER] Shutting down...")
         finally:
             self.stop()
-    
+
     def stop(self):
         """Stop the chat server."""
         self.running = False
-        
-        # Close all client connections
-        with self.lock:
-            for conn in list(self.clients.keys()):
-                try:
-                    conn.close()
-                except:
-                    pass
-            self.clients.clear()
-            self.usernames.clear()
-        
+
+        # Close all client connections (logged in or not).
+        # shutdown() tears the connection down immediately on the peer
+        # side instead of waiting for garbage collection of the fd.
+        for conn in list(self.clients.keys()):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except:
+                pass
+            try:
+                conn.close()
+            except:
+                pass
+        self.clients.clear()
+        self.by_name.clear()
+        self._recipients = ()
+        for bucket in self.wheel:
+            bucket.clear()
+
+        if self.selector:
+            try:
+                self.selector.close()
+            except:
+                pass
+
         if self.server_socket:
             try:
                 self.server_socket.close()
             except:
                 pass
-        
+
         print("[SERVER] Server stopped.")
-    
-    def _handle_client(self, conn: socket.socket, addr):
-        """Handle a single client connection."""
-        username = None
-        
+
+    def _accept(self):
+        """Accept a new connection and register it with the event loop."""
         try:
-            # Set socket timeout for idle detection
-            conn.settimeout(5.0)  # Check every 5 seconds
-            
+            conn, addr = self.server_socket.accept()
+        except socket.error as e:
+            if self.running:
+                print(f"[SERVER] Socket error: {e}")
+            return
+
+        print(f"[SERVER] New connection from {addr}")
+
+        conn.setblocking(False)
+        # Small chat lines are latency-sensitive: disable Nagle so each
+        # line hits the wire immediately instead of waiting up to 40ms
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Let the kernel probe and reap dead peers behind half-open
+        # connections instead of waiting for the application timeout
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            # Linux: start probing around the idle-timeout boundary
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.idle_timeout)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+
+        self.selector.register(conn, selectors.EVENT_READ)
+        client = Client(conn)
+        self.clients[conn] = client
+        self._touch(client)
+
+    def _handle_readable(self, conn: socket.socket):
+        """Read from a client socket and process any complete lines."""
+        client = self.clients.get(conn)
+        if client is None:
+            return
+        buf = client.buffer
+
+        # Drain everything the kernel has buffered so a single epoll
+        # wakeup handles all pending data for this socket
+        received = False
+        closed = False
+        while True:
+            try:
+                data = conn.recv(8192)
+            except BlockingIOError:
+                break
+            except ConnectionResetError:
+                closed = True
+                break
+            except Exception as e:
+                print(f"[SERVER] Error receiving from {client.name or 'client'}: {e}")
+                closed = True
+                break
+
+            if not data:
+                # Client disconnected
+                closed = True
+                break
+
+            # Buffer raw bytes; decode only once a complete line arrived.
+            # find + del keep the framing cost linear even for clients
+            # that trickle a long line in tiny packets.
+            buf += data
+            received = True
+
+        if received:
             # Update activity timestamp
-            with self.lock:
-                self.last_activity[conn] = time.time()
-            
-            # Wait for LOGIN
-            username = self._handle_login(conn, addr)
-            
+            self._touch(client)
+
+            # Process complete lines
+            for raw in _drain_lines(buf):
+                # ASCII fast path: command traffic is almost always
+                # pure ASCII, where isascii + ascii decode are a
+                # near-memcpy. Only lines with non-ASCII payload bytes
+                # pay for the full UTF-8 state machine, and 'replace'
+                # keeps malformed bytes visible instead of silently
+                # dropping them mid-sequence.
+                if raw.isascii():
+                    line = raw.decode('ascii').strip()
+                else:
+                    line = raw.decode('utf-8', errors='replace').strip()
+
+                if not line:
+                    continue
+
+                if client.name:
+                    self._process_command(conn, client.name, line)
+                else:
+                    self._handle_login(conn, line)
+
+                if conn not in self.clients:
+                    # Client was removed while processing a command
+                    return
+
+            # Guard against a client that never sends a newline
+            if len(buf) > self.MAX_LINE:
+                print(f"[SERVER] Dropping {client.name or 'client'}: line too long")
+                self._send(conn, self._ERR_LINE_TOO_LONG)
+                self._remove_client(conn)
+                return
+
+        if closed:
+            self._remove_client(conn)
+
+    def _handle_login(self, conn: socket.socket, line: str):
+        """Handle a command from a client that has not logged in yet."""
+        # Parse LOGIN command
+        if line.startswith('LOGIN '):
+            username = line[6:].strip()
+
             if not username:
-                conn.close()
+                self._send(conn, self._ERR_INVALID_USERNAME)
                 return
-            
-            print(f"[SERVER] User '{username}' logged in from {addr}")
-            
-            # Main message loop
-            buffer = ""
-            while self.running:
-                try:
-                    data = conn.recv(1024)
-                    
-                    if not data:
-                        # Client disconnected
-                        break
-                    
-                    # Update activity timestamp
-                    with self.lock:
-                        self.last_activity[conn] = time.time()
-                    
-                    # Decode and buffer the data
-                    buffer += data.decode('utf-8', errors='ignore')
-                    
-                    # Process complete lines
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        line = line.strip()
-                        
-                        if line:
-                            self._process_command(conn, username, line)
-                            
-                except socket.timeout:
-                    # Timeout is normal, just continue
-                    continue
-                except ConnectionResetError:
-                    break
-                except Exception as e:
-                    print(f"[SERVER] Error receiving from {username}: {e}")
-                    break
-                    
-        except Exception as e:
-            print(f"[SERVER] Error handling client {addr}: {e}")
-        finally:
-            # Clean up
-            self._remove_client(conn, username)
-    
-    def _handle_login(self, conn: socket.socket, addr) -> Optional[str]:
-        """Handle the login process. Returns username if successful, None otherwise."""
-        buffer = ""
-        
-        while self.running:
-            try:
-                data = conn.recv(1024)
-                
-                if not data:
-                    return None
-                
-                # Update activity
-                with self.lock:
-                    self.last_activity[conn] = time.time()
-                
-                buffer += data.decode('utf-8', errors='ignore')
-                
-                # Look for complete line
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
-                    
-                    if not line:
-                        continue
-                    
-                    # Parse LOGIN command
-                    if line.startswith('LOGIN '):
-                        username = line[6:].strip()
-                        
-                        if not username:
-                            self._send(conn, "ERR invalid-username")
-                            continue
-                        
-                        # Check if username is taken
-                        with self.lock:
-                            if username in self.usernames:
-                                self._send(conn, "ERR username-taken")
-                                continue
-                            
-                            # Register the user
-                            self.clients[conn] = username
-                            self.usernames[username] = conn
-                        
-                        self._send(conn, "OK")
-                        return username
-                    else:
-                        self._send(conn, "ERR must-login-first")
-                        
-            except socket.timeout:
-                continue
-            except Exception as e:
-                print(f"[SERVER] Login error from {addr}: {e}")
-                return None
-        
-        return None
-    
+
+            # Check if username is taken
+            if username in self.by_name:
+                self._send(conn, self._ERR_USERNAME_TAKEN)
+                return
+
+            # Register the user
+            client = self.clients[conn]
+            client.name = username
+            self.by_name[username] = client
+            self._rebuild_recipients()
+
+            self._send(conn, self._OK)
+            print(f"[SERVER] User '{username}' logged in")
+        else:
+            self._send(conn, self._ERR_MUST_LOGIN)
+
     def _process_command(self, conn: socket.socket, username: str, line: str):
         """Process a command from a logged-in user."""
-        
-        # MSG <text> - broadcast message
-        if line.startswith('MSG '):
-            text = line[4:].strip()
-            if text:
-                self._broadcast(f"MSG {username} {text}", exclude=conn)
-        
-        # WHO - list active users
-        elif line == 'WHO':
-            with self.lock:
-                for user in self.usernames.keys():
-                    self._send(conn, f"USER {user}")
-        
-        # DM <username> <text> - private message
-        elif line.startswith('DM '):
-            parts = line[3:].strip().split(' ', 1)
-            if len(parts) >= 2:
-                target_user, text = parts[0], parts[1]
-                self._send_private(conn, username, target_user, text)
-            else:
-                self._send(conn, "ERR invalid-dm-format")
-        
-        # PING - heartbeat
-        elif line == 'PING':
-            self._send(conn, "PONG")
-        
-        # Unknown command - treat as message content (be lenient)
+        cmd, _, rest = line.partition(' ')
+
+        handler = self._dispatch.get(cmd)
+        if handler is not None:
+            handler(conn, username, rest)
+        # Unknown commands are silently ignored (be lenient)
+
+    def _cmd_msg(self, conn: socket.socket, username: str, rest: str):
+        """MSG <text> - broadcast message."""
+        text = rest.strip()
+        if text:
+            self._broadcast(f"MSG {username} {text}", exclude=conn)
+
+    def _cmd_who(self, conn: socket.socket, username: str, rest: str):
+        """WHO - list active users."""
+        if rest:
+            return
+        # One payload, one send, instead of a syscall per user
+        payload = ''.join(f"USER {user}\n" for user in self.by_name).encode('utf-8')
+        self._send(conn, payload)
+
+    def _cmd_dm(self, conn: socket.socket, username: str, rest: str):
+        """DM <username> <text> - private message."""
+        parts = rest.strip().split(' ', 1)
+        if len(parts) >= 2:
+            self._send_private(conn, username, parts[0], parts[1])
         else:
-            # Silently ignore unknown commands
+            self._send(conn, self._ERR_INVALID_DM)
+
+    def _cmd_ping(self, conn: socket.socket, username: str, rest: str):
+        """PING - heartbeat."""
+        if rest:
+            return
+        self._send(conn, self._PONG)
+
+    def _send_client(self, client: Client, payload: bytes):
+        """Send a pre-encoded payload, queueing whatever the kernel won't take."""
+        if client.out:
+            # Already backlogged: coalesce behind the pending bytes so
+            # the next writable event flushes everything in one send
+            client.out += payload
+            self._check_outbuf(client)
+            return
+
+        try:
+            sent = client.sock.send(payload)
+        except BlockingIOError:
+            sent = 0
+        except Exception as e:
+            print(f"[SERVER] Error sending message: {e}")
+            return
+
+        if sent < len(payload):
+            client.out += payload[sent:]
+            self._check_outbuf(client)
+            if client.out:
+                self._watch_writable(client, True)
+
+    def _send_parts(self, client: Client, parts: List[bytes]):
+        """Send payload pieces scatter-gather, without concatenating them.
+
+        One sendmsg ships all the pieces, so callers can pass a header,
+        body and terminator separately instead of building the joined
+        line in userspace first.
+        """
+        if not _HAS_SENDMSG:
+            self._send_client(client, b''.join(parts))
+            return
+
+        if client.out:
+            # Already backlogged: append behind the pending bytes
+            for part in parts:
+                client.out += part
+            self._check_outbuf(client)
+            return
+
+        try:
+            sent = client.sock.sendmsg(parts)
+        except BlockingIOError:
+            sent = 0
+        except Exception as e:
+            print(f"[SERVER] Error sending message: {e}")
+            return
+
+        # Queue whatever the kernel didn't take
+        for part in parts:
+            if sent >= len(part):
+                sent -= len(part)
+                continue
+            client.out += part[sent:] if sent else part
+            sent = 0
+
+        if client.out:
+            self._check_outbuf(client)
+            if client.out:
+                self._watch_writable(client, True)
+
+    def _send(self, conn: socket.socket, payload: bytes):
+        """Send a pre-encoded payload to a single client."""
+        client = self.clients.get(conn)
+        if client is not None:
+            self._send_client(client, payload)
+
+    def _send_str(self, conn: socket.socket, message: str):
+        """Encode a dynamic message and send it to a single client."""
+        self._send(conn, (message + '\n').encode('utf-8'))
+
+    def _check_outbuf(self, client: Client):
+        """Drop a peer whose pending output exceeds the allowed backlog."""
+        if len(client.out) > self.MAX_OUTBUF:
+            print(f"[SERVER] Dropping {client.name or 'client'}: send backlog too large")
+            self._remove_client(client.sock)
+
+    def _watch_writable(self, client: Client, writable: bool):
+        """Toggle EVENT_WRITE interest for a client's socket."""
+        events = selectors.EVENT_READ
+        if writable:
+            events |= selectors.EVENT_WRITE
+        try:
+            self.selector.modify(client.sock, events)
+        except (KeyError, ValueError):
             pass
-    
-    def _send(self, conn: socket.socket, message: str):
-        """Send a message to a single client."""
+
+    def _handle_writable(self, conn: socket.socket):
+        """Flush a client's pending output once the socket drains."""
+        client = self.clients.get(conn)
+        if client is None:
+            return
+
         try:
-            conn.sendall((message + '\n').encode('utf-8'))
+            sent = conn.send(client.out)
+        except BlockingIOError:
+            return
         except Exception as e:
             print(f"[SERVER] Error sending message: {e}")
-    
+            self._remove_client(conn)
+            return
+
+        del client.out[:sent]
+        if not client.out:
+            self._watch_writable(client, False)
+
     def _broadcast(self, message: str, exclude: Optional[socket.socket] = None):
         """Broadcast a message to all connected clients."""
-        with self.lock:
-            for conn in list(self.clients.keys()):
-                if conn != exclude:
-                    try:
-                        conn.sendall((message + '\n').encode('utf-8'))
-                    except Exception as e:
-                        print(f"[SERVER] Error broadcasting to client: {e}")
-    
+        # Encode once; every recipient gets the same bytes
+        payload = (message + '\n').encode('utf-8')
+
+        # The cached tuple is immutable, so removals triggered mid-loop
+        # (e.g. a peer over its backlog cap) can't corrupt the iteration
+        for client in self._recipients:
+            if client.sock is not exclude:
+                self._send_client(client, payload)
+
     def _send_private(self, sender_conn: socket.socket, from_user: str, to_user: str, text: str):
         """Send a private message to a specific user."""
-        with self.lock:
-            if to_user not in self.usernames:
-                self._send(sender_conn, f"ERR user-not-found {to_user}")
-                return
-            
-            target_conn = self.usernames[to_user]
-        
-        self._send(target_conn, f"DM {from_user} {text}")
-    
-    def _remove_client(self, conn: socket.socket, username: Optional[str]):
+        target = self.by_name.get(to_user)
+        if target is None:
+            self._send_str(sender_conn, f"ERR user-not-found {to_user}")
+            return
+
+        # Header, body and newline go out in one scatter-gather send;
+        # no concatenated line is ever built for large payloads
+        self._send_parts(target, [f"DM {from_user} ".encode('utf-8'),
+                                  text.encode('utf-8'), b'\n'])
+
+    def _remove_client(self, conn: socket.socket):
         """Remove a client and notify others."""
-        with self.lock:
-            # Remove from tracking
-            if conn in self.clients:
-                del self.clients[conn]
-            if username and username in self.usernames:
-                del self.usernames[username]
-            if conn in self.last_activity:
-                del self.last_activity[conn]
-        
+        # pop() guards against double removal (e.g. a timer expiry
+        # racing a recv error in the same loop iteration)
+        client = self.clients.pop(conn, None)
+
+        if self.selector:
+            try:
+                self.selector.unregister(conn)
+            except (KeyError, ValueError):
+                pass
+
+        if client is not None:
+            if client.name:
+                self.by_name.pop(client.name, None)
+                self._rebuild_recipients()
+            if client.bucket >= 0:
+                self.wheel[client.bucket].discard(client)
+
         # Close connection
         try:
             conn.close()
         except:
             pass
-        
-        # Notify others if user was logged in
-        if username:
-            print(f"[SERVER] User '{username}' disconnected")
-            self._broadcast(f"INFO {username} disconnected")
-    
-    def _check_idle_clients(self):
-        """Background thread to check for idle clients."""
-        while self.running:
-            time.sleep(10)  # Check every 10 seconds
-            
-            current_time = time.time()
-            clients_to_remove = []
-            
-            with self.lock:
-                for conn, last_time in list(self.last_activity.items()):
-                    if current_time - last_time > self.idle_timeout:
-                        username = self.clients.get(conn)
-                        clients_to_remove.append((conn, username))
-            
-            # Remove idle clients (outside the lock to avoid deadlock)
-            for conn, username in clients_to_remove:
-                if username:
-                    print(f"[SERVER] User '{username}' timed out (idle)")
-                    try:
-                        self._send(conn, "ERR idle-timeout")
-                    except:
-                        pass
-                self._remove_client(conn, username)
+
+        # Notify others if user was logged in. The leaver is already
+        # out of the registry, so the fan-out needs no exclude check.
+        if client is not None and client.name:
+            print(f"[SERVER] User '{client.name}' disconnected")
+            payload = f"INFO {client.name} disconnected\n".encode('utf-8')
+            for other in self._recipients:
+                self._send_client(other, payload)
+
+    def _rebuild_recipients(self):
+        """Recompute the cached broadcast fan-out tuple.
+
+        Called only on login and disconnect, so the O(N) walk is paid
+        at join/leave rate rather than once per broadcast.
+        """
+        self._recipients = tuple(c for c in self.clients.values() if c.name)
+
+    def _touch(self, client: Client):
+        """Reset a client's idle timer, moving it to its new wheel bucket."""
+        deadline = time.time() + self.idle_timeout
+        # int(deadline) + 1 rounds up, so the wheel position has always
+        # passed the deadline by the time the bucket is drained
+        bucket = (int(deadline) + 1) % self.WHEEL_SIZE
+
+        if bucket != client.bucket:
+            if client.bucket >= 0:
+                self.wheel[client.bucket].discard(client)
+            self.wheel[bucket].add(client)
+            client.bucket = bucket
+        client.deadline = deadline
+
+    def _next_timer_delay(self) -> Optional[float]:
+        """Seconds until the next timer bucket could expire (None if no timers)."""
+        if not self.clients:
+            return None
+
+        now = time.time()
+        base = max(self._wheel_pos, int(now))
+        for i in range(self.WHEEL_SIZE):
+            if self.wheel[(base + i) % self.WHEEL_SIZE]:
+                return max(0.0, (base + i) - now)
+        return None
+
+    def _expire_timers(self):
+        """Drain the wheel buckets the clock has passed, expiring idle clients."""
+        now = time.time()
+
+        # After a long quiet period with no timers the pointer can be
+        # far behind the clock. One full revolution visits every
+        # bucket, so anything older can be skipped outright instead of
+        # stepping second by second to catch up.
+        if int(now) - self._wheel_pos > self.WHEEL_SIZE:
+            self._wheel_pos = int(now) - self.WHEEL_SIZE
+
+        while self._wheel_pos <= int(now):
+            bucket = self.wheel[self._wheel_pos % self.WHEEL_SIZE]
+            for client in list(bucket):
+                # A deadline in the future means the entry belongs to a
+                # later revolution of the wheel; leave it in place
+                if client.deadline > now:
+                    continue
+
+                if client.name:
+                    print(f"[SERVER] User '{client.name}' timed out (idle)")
+                    self._send(client.sock, self._ERR_IDLE_TIMEOUT)
+                self._remove_client(client.sock)
+            self._wheel_pos += 1
 
 
 def main():
@@ -352,12 +623,18 @@ def main():
         default=60,
         help='Idle timeout in seconds (default: 60)'
     )
-    
+    parser.add_argument(
+        '--reuse-port',
+        action='store_true',
+        help='Set SO_REUSEPORT so multiple server processes can share the port'
+    )
+
     args = parser.parse_args()
-    
+
     # Create and start server
-    server = ChatServer(port=args.port, idle_timeout=args.idle_timeout)
-    
+    server = ChatServer(port=args.port, idle_timeout=args.idle_timeout,
+                        reuse_port=args.reuse_port)
+
     try:
         server.start()
     except KeyboardInterrupt: